@@ -0,0 +1,531 @@
+import argparse
+import contextlib
+import http.client
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Operators of the language, grouped by the number of S arguments they take
+BINARY_OPS = ['+', '−', '×', '=']
+IDENTIFIERS = ['x', 'y', 'z', 'f', 'g', 'n', 'acc', 'foo', 'var']
+
+
+# Parse "4" or "2-8" into an inclusive (low, high) range
+def parse_range(spec):
+    low, _, high = spec.partition('-')
+    low = int(low)
+    high = int(high) if high else low
+    if low < 0 or high < low:
+        raise argparse.ArgumentTypeError(f'invalid range "{spec}"')
+    return (low, high)
+
+
+# Parse a comma separated sweep such as "1,4,16" or "1-4,8"
+def parse_sweep(spec):
+    return [parse_range(part.strip()) for part in spec.split(',') if part.strip()]
+
+
+# Parse a strictly positive integer option
+def positive_int(spec):
+    try:
+        value = int(spec)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid integer "{spec}"')
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {value}')
+    return value
+
+
+# Parse a strictly positive number of seconds
+def positive_float(spec):
+    try:
+        value = float(spec)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid number "{spec}"')
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f'must be greater than 0, got {spec}')
+    return value
+
+
+# Parse a comma separated list of positive integers such as "1,4,16"
+def parse_counts(spec):
+    return [positive_int(part.strip()) for part in spec.split(',') if part.strip()]
+
+
+# Grammar-driven random expression generator following P -> S, S -> number | identifier | ( M )
+class ExpressionGenerator:
+    def __init__(self, rng, depth, invalid_ratio=0.0, repeat_rate=0.0, nest_prob=0.5, pool_size=256):
+        self.rng = rng
+        self.depth = depth
+        self.invalid_ratio = invalid_ratio
+        self.repeat_rate = repeat_rate
+        self.nest_prob = nest_prob
+        self.pool = []
+        self.pool_size = pool_size
+
+    def atom(self):
+        # Numbers never carry a leading zero, identifiers are letters only
+        if self.rng.random() < 0.5:
+            return str(self.rng.choice([0, self.rng.randint(1, 99999)]))
+        return self.rng.choice(IDENTIFIERS)
+
+    def expr(self, depth):
+        # S production; depth is the exact nesting depth this subtree must reach
+        if depth == 0:
+            return self.atom()
+        return '(' + self.paren_expr(depth) + ')'
+
+    def sub_depth(self, depth):
+        # Depth of a sibling that is not required to reach the target depth
+        if depth > 1 and self.rng.random() < self.nest_prob:
+            return self.rng.randint(1, depth - 1)
+        return 0
+
+    def arguments(self, count, depth):
+        # One argument carries the full remaining depth, the others are random
+        deep = self.rng.randrange(count)
+        return [self.expr(depth - 1 if i == deep else self.sub_depth(depth)) for i in range(count)]
+
+    def paren_expr(self, depth):
+        # M production: binary op, conditional, lambda, let or application
+        kind = self.rng.choice(['binary', 'conditional', 'lambda', 'let', 'application'])
+        if kind == 'binary':
+            return ' '.join([self.rng.choice(BINARY_OPS)] + self.arguments(2, depth))
+        if kind == 'conditional':
+            return ' '.join(['?'] + self.arguments(3, depth))
+        if kind == 'lambda':
+            return ' '.join(['λ', self.rng.choice(IDENTIFIERS)] + self.arguments(1, depth))
+        if kind == 'let':
+            return ' '.join(['≜', self.rng.choice(IDENTIFIERS)] + self.arguments(2, depth))
+        return ' '.join(self.arguments(self.rng.randint(1, 3), depth))
+
+    def mutate(self, expression):
+        # Turn a valid expression into one the parser must reject
+        mutations = [
+            lambda e: e[:e.rindex(')')] if ')' in e else '(' + e,        # missing closing paren
+            lambda e: e + ')',                                            # unmatched closing paren
+            lambda e: '(+ ' + e + ' ' + e + ' ' + self.atom() + ')',      # too many arguments
+            lambda e: '(? ' + e + ')',                                    # too few arguments
+            lambda e: '(λ 1 ' + e + ')',                                  # lambda without identifier
+            lambda e: '( ) ' + e,                                         # empty parentheses
+        ]
+        return self.rng.choice(mutations)(expression)
+
+    def next(self):
+        # Return (expression, expected_success), replaying earlier ones at repeat_rate
+        if self.pool and self.rng.random() < self.repeat_rate:
+            return self.rng.choice(self.pool)
+        expression = self.expr(self.rng.randint(*self.depth))
+        # A bare identifier parses to a plain string, which app.py reports as an error
+        item = (expression, not expression.isalpha())
+        if self.rng.random() < self.invalid_ratio:
+            item = (self.mutate(expression), False)
+        if len(self.pool) < self.pool_size:
+            self.pool.append(item)
+        else:
+            self.pool[self.rng.randrange(self.pool_size)] = item
+        return item
+
+
+# Resident set size in KiB of a process and all of its descendants (Linux only)
+def process_tree_rss(pid):
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+                        break
+            with open(f'/proc/{current}/task/{current}/children') as f:
+                pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            if current == pid:
+                return None
+    return total
+
+
+# Background thread that samples server RSS while a scenario runs
+class RSSSampler(threading.Thread):
+    def __init__(self, pid, interval=0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            rss = process_tree_rss(self.pid)
+            if rss is not None:
+                self.samples.append(rss)
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        rss = process_tree_rss(self.pid)
+        if rss is not None:
+            self.samples.append(rss)
+        if not self.samples:
+            return None
+        return {'start_kib': self.samples[0], 'peak_kib': max(self.samples), 'end_kib': self.samples[-1]}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(port, proc, timeout=15.0):
+    # Poll the index page until the server answers, giving up early if the server process exits
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'server exited with code {proc.returncode} before accepting requests')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not start within {timeout}s')
+
+
+# Serve app.py from a werkzeug thread inside this process
+@contextlib.contextmanager
+def inprocess_server():
+    from werkzeug.serving import make_server
+
+    # app.py reads index.html relative to the working directory, but only at import time
+    cwd = os.getcwd()
+    os.chdir(HERE)
+    sys.path.insert(0, HERE)
+    try:
+        from app import app
+    finally:
+        os.chdir(cwd)
+
+    # Werkzeug logs every request; gunicorn has no access log by default, so keep both modes quiet
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        # No server pid: this process also holds the clients, so its RSS is not the server's
+        yield server.server_port, None
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+# Serve app.py under gunicorn as a child process
+@contextlib.contextmanager
+def gunicorn_server(workers, threads):
+    port = free_port()
+    command = [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', str(threads),
+               '--bind', f'127.0.0.1:{port}', 'app:app']
+    # gunicorn logs to stderr; keep it so a failed start can be explained
+    log = tempfile.TemporaryFile()
+    proc = subprocess.Popen(command, cwd=HERE, stdout=subprocess.DEVNULL, stderr=log)
+    try:
+        try:
+            wait_until_ready(port, proc)
+        except RuntimeError as e:
+            log.seek(0)
+            output = log.read().decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f'{e}\n--- gunicorn output ---\n{output}') from None
+        yield port, proc.pid
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        log.close()
+
+
+# One simulated client: sends requests over a keep-alive connection until told to stop
+def run_client(port, generator, endpoint, batch_size, rng, deadline, max_requests, records):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    sent = 0
+    while time.monotonic() < deadline and (max_requests is None or sent < max_requests):
+        if endpoint == 'parse':
+            expression, expected = generator.next()
+            path, payload = '/parse', {'expression': expression}
+            expected = [expected]
+        else:
+            items = [generator.next() for _ in range(rng.randint(*batch_size))]
+            path, payload = '/parse_batch', {'expressions': [e for e, _ in items]}
+            expected = [v for _, v in items]
+        body = json.dumps(payload).encode('utf-8')
+        size = len(body)
+
+        start = time.perf_counter()
+        try:
+            conn.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            status, data = None, b''
+        latency = time.perf_counter() - start
+
+        records.append((latency, status, size, mismatches(endpoint, payload, expected, status, data), len(expected)))
+        sent += 1
+    conn.close()
+
+
+# Count results whose success flag disagrees with what the generator expects app.py to report
+def mismatches(endpoint, payload, expected, status, data):
+    if status != 200:
+        return 0
+    try:
+        result = json.loads(data)
+    except ValueError:
+        return len(expected)
+    if endpoint == 'parse':
+        return int(result.get('success') != expected[0])
+    count = 0
+    for expression, valid in zip(payload['expressions'], expected):
+        entry = result.get(expression.strip())
+        if entry is None or entry.get('success') != valid:
+            count += 1
+    return count
+
+
+# Nearest-rank percentile of an already sorted list
+def percentile(values, pct):
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def summarise(records, elapsed):
+    latencies = sorted(r[0] for r in records)
+    total = len(records)
+    expressions = sum(r[4] for r in records)
+    transport_errors = sum(1 for r in records if r[1] is None)
+    server_errors = sum(1 for r in records if r[1] is not None and r[1] >= 500)
+    client_errors = sum(1 for r in records if r[1] is not None and 400 <= r[1] < 500)
+    errors = transport_errors + server_errors + client_errors
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 3)
+
+    return {
+        'requests': total,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+        'throughput_eps': round(expressions / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'mean': ms(sum(latencies) / total) if total else None,
+            'p50': ms(percentile(latencies, 50)),
+            'p95': ms(percentile(latencies, 95)),
+            'p99': ms(percentile(latencies, 99)),
+            'max': ms(latencies[-1]) if latencies else None,
+        },
+        'errors': {
+            'transport': transport_errors,
+            'http_5xx': server_errors,
+            'http_4xx': client_errors,
+            'rate': round(errors / total, 4) if total else None,
+        },
+        'unexpected_results': sum(r[3] for r in records),
+        'mean_payload_bytes': round(sum(r[2] for r in records) / total, 1) if total else None,
+        'expressions_per_request': round(expressions / total, 2) if total else None,
+    }
+
+
+def run_scenario(port, pid, args, clients, depth, batch_size, seed):
+    deadline = time.monotonic() + args.duration
+    records = []
+    threads = []
+    for i in range(clients):
+        rng = random.Random(f'{seed}-{i}')
+        generator = ExpressionGenerator(rng, depth, args.invalid_ratio, args.repeat_rate, args.nest_prob)
+        # Split --requests across clients so the total matches exactly
+        max_requests = None
+        if args.requests:
+            max_requests = args.requests // clients + (1 if i < args.requests % clients else 0)
+        threads.append(threading.Thread(
+            target=run_client,
+            args=(port, generator, args.endpoint, batch_size, rng, deadline, max_requests, records)))
+
+    sampler = RSSSampler(pid) if pid is not None else None
+    if sampler:
+        sampler.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    rss = sampler.stop() if sampler else None
+
+    result = summarise(records, elapsed)
+    result['server_rss'] = rss
+    return result
+
+
+# Settings that change the workload or the server, so runs that differ in them are not comparable
+COMPARED_CONFIG = ['server', 'workers', 'threads', 'duration_s', 'requests', 'nest_prob', 'invalid_ratio',
+                   'repeat_rate', 'seed']
+
+
+def config_mismatches(config, baseline):
+    return [name for name in COMPARED_CONFIG if config.get(name) != baseline['config'].get(name)]
+
+
+def scenario_key(scenario):
+    return (scenario['endpoint'], scenario['clients'], tuple(scenario['depth']), tuple(scenario['batch_size']))
+
+
+# Attach relative changes against a previous results file to each matching scenario
+def compare(results, baseline):
+    previous = {scenario_key(s): s for s in baseline['scenarios']}
+    for scenario in results['scenarios']:
+        old = previous.get(scenario_key(scenario))
+        if old is None:
+            continue
+        pairs = {
+            'throughput_rps': (old['throughput_rps'], scenario['throughput_rps']),
+            'throughput_eps': (old.get('throughput_eps'), scenario['throughput_eps']),
+            'p50_ms': (old['latency_ms']['p50'], scenario['latency_ms']['p50']),
+            'p95_ms': (old['latency_ms']['p95'], scenario['latency_ms']['p95']),
+            'p99_ms': (old['latency_ms']['p99'], scenario['latency_ms']['p99']),
+            'error_rate': (old['errors']['rate'], scenario['errors']['rate']),
+        }
+        delta = {}
+        for name, (before, after) in pairs.items():
+            if before is None or after is None:
+                delta[name] = None
+            elif before == 0:
+                delta[name] = {'before': before, 'after': after, 'change': None}
+            else:
+                delta[name] = {'before': before, 'after': after, 'change': round((after - before) / before, 4)}
+        scenario['vs_baseline'] = delta
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=HERE, stderr=subprocess.DEVNULL,
+                                       text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Local load generator for the LL(1) parser web service.')
+    parser.add_argument('--server', choices=['inprocess', 'gunicorn'], default='inprocess',
+                        help='run app.py in a werkzeug thread or under gunicorn on localhost')
+    parser.add_argument('--workers', type=positive_int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=positive_int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--endpoint', choices=['parse', 'parse_batch'], default='parse')
+    parser.add_argument('--clients', type=parse_counts, default=parse_counts('1,4'),
+                        help='concurrent clients, comma separated to sweep (e.g. 1,4,16)')
+    parser.add_argument('--depth', type=parse_sweep, default=parse_sweep('0-4'),
+                        help='nesting depth, "N" or "LOW-HIGH" drawn uniformly, comma separated to sweep')
+    parser.add_argument('--batch-size', type=parse_sweep, default=parse_sweep('10'),
+                        help='expressions per /parse_batch request, same syntax as --depth')
+    parser.add_argument('--nest-prob', type=float, default=0.5,
+                        help='probability that a non-critical argument is itself nested')
+    parser.add_argument('--invalid-ratio', type=float, default=0.2, help='share of invalid expressions')
+    parser.add_argument('--repeat-rate', type=float, default=0.0, help='share of expressions replayed')
+    parser.add_argument('--duration', type=positive_float, default=10.0, help='seconds per scenario')
+    parser.add_argument('--requests', type=positive_int, default=None,
+                        help='stop each scenario after this many requests (still bounded by --duration)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write JSON results here instead of stdout')
+    parser.add_argument('--baseline', help='previous results file to compare against')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    config = {
+        'server': args.server,
+        'workers': args.workers if args.server == 'gunicorn' else None,
+        'threads': args.threads if args.server == 'gunicorn' else None,
+        'duration_s': args.duration,
+        'requests': args.requests,
+        'nest_prob': args.nest_prob,
+        'invalid_ratio': args.invalid_ratio,
+        'repeat_rate': args.repeat_rate,
+        'seed': args.seed,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        differing = config_mismatches(config, baseline)
+        if differing:
+            parser.error(f'baseline {args.baseline} was run with different settings: {", ".join(differing)}')
+    most_clients = max(args.clients)
+    if args.requests is not None and args.requests < most_clients:
+        parser.error(f'--requests ({args.requests}) must be at least the largest --clients value ({most_clients})')
+
+    batch_sizes = args.batch_size if args.endpoint == 'parse_batch' else [(1, 1)]
+    stdout = sys.stdout
+
+    if args.server == 'gunicorn':
+        server = gunicorn_server(args.workers, args.threads)
+    else:
+        server = inprocess_server()
+
+    scenarios = []
+    # The parser prints its stack trace on every step; keep that out of the results
+    with server as (port, pid), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for clients, depth, batch_size in itertools.product(args.clients, args.depth, batch_sizes):
+            result = run_scenario(port, pid, args, clients, depth, batch_size, args.seed)
+            scenario = {
+                'endpoint': args.endpoint,
+                'clients': clients,
+                'depth': list(depth),
+                'batch_size': list(batch_size),
+            }
+            scenario.update(result)
+            scenarios.append(scenario)
+            print(f"clients={clients} depth={depth} batch={batch_size}: "
+                  f"{result['throughput_rps']} req/s, p99 {result['latency_ms']['p99']} ms",
+                  file=sys.stderr)
+
+    results = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'config': config,
+        'scenarios': scenarios,
+    }
+    if baseline:
+        compare(results, baseline)
+
+    text = json.dumps(results, ensure_ascii=False, indent=4)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text, file=stdout)
+
+
+if __name__ == '__main__':
+    main()
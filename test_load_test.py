@@ -0,0 +1,33 @@
+from load_test import compare
+
+
+def make_results(throughput, p99, batch_size=(10, 10)):
+    return {
+        'config': {'server': 'inprocess'},
+        'scenarios': [{
+            'endpoint': 'parse_batch',
+            'clients': 4,
+            'depth': [0, 4],
+            'batch_size': list(batch_size),
+            'throughput_rps': throughput,
+            'throughput_eps': throughput * 10,
+            'latency_ms': {'p50': 1.0, 'p95': 2.0, 'p99': p99},
+            'errors': {'rate': 0.0},
+        }],
+    }
+
+
+def test_compare_attaches_deltas_to_matching_scenarios():
+    results = make_results(150.0, 5.0)
+    compare(results, make_results(100.0, 10.0))
+    delta = results['scenarios'][0]['vs_baseline']
+    assert delta['throughput_rps'] == {'before': 100.0, 'after': 150.0, 'change': 0.5}
+    assert delta['throughput_eps']['change'] == 0.5
+    assert delta['p99_ms']['change'] == -0.5
+    assert delta['error_rate'] == {'before': 0.0, 'after': 0.0, 'change': None}
+
+
+def test_compare_skips_scenarios_missing_from_baseline():
+    results = make_results(150.0, 5.0, batch_size=(1, 100))
+    compare(results, make_results(100.0, 10.0))
+    assert 'vs_baseline' not in results['scenarios'][0]